@@ -9,28 +9,37 @@ import typing
 import requests
 
 from update.game import update_game
+from util.thunderdome_user import get_user_id
 
 if typing.TYPE_CHECKING:
     import argparse
 
 
-def create_game(plans: list[dict], args: argparse.Namespace) -> None:
+# Optional battle settings as (body key, argument name) pairs.
+# Settings are only sent when they are set on the command line.
+OPTIONAL_BATTLE_SETTINGS = (
+    ("autoFinishVoting", "auto_finish"),
+    ("leaders", "leaders"),
+    ("estimationScaleId", "scale_id"),
+    ("hideVoterIdentity", "hide_identity"),
+    ("joinCode", "join_password"),
+    ("leaderCode", "leader_password"),
+)
+
+
+def create_game(
+    plans: list[dict], args: argparse.Namespace, session: requests.Session
+) -> None:
     """
     Create a Thunderdome game.
 
     :plans: Plans for the battle.
     :args: Command line arguments.
+    :session: Session for the Thunderdome API.
     """
-    thunderdome_headers = {
-        "accept": "application/json",
-        "X-API-Key": args.api_key,
-    }
-
-    thunderdome_response = requests.get(
-        "https://thunderdome.dev/api/auth/user", timeout=10, headers=thunderdome_headers
-    )
-    payload = thunderdome_response.json()
-    user_id = payload["data"]["id"]
+    user_id = get_user_id(session)
+    if user_id is None:
+        return
 
     # Create battle
 
@@ -55,37 +64,32 @@ def create_game(plans: list[dict], args: argparse.Namespace) -> None:
     }
 
     # optional body parameters
-    if args.auto_finish is not None:
-        battle_settings_body["autoFinishVoting"] = args.auto_finish
-
-    if args.leaders is not None:
-        battle_settings_body["leaders"] = args.leaders
-
-    if args.scale_id is not None:
-        battle_settings_body["estimationScaleId"] = args.scale_id
-
-    if args.hide_identity is not None:
-        battle_settings_body["hideVoterIdentity"] = args.hide_identity
-
-    if args.join_password is not None:
-        battle_settings_body["joinCode"] = args.join_password
-
-    if args.leader_password is not None:
-        battle_settings_body["leaderCode"] = args.leader_password
+    battle_settings_body.update({
+        key: value for key, attr in OPTIONAL_BATTLE_SETTINGS
+        if (value := getattr(args, attr))
+    })
+
+    # The session only retries this request if it was rate limited or the
+    # connection failed before it was sent, because any other failure can
+    # happen after Thunderdome created the battle
+    try:
+        thunderdome_response = session.post(
+            request_url,
+            timeout=10,
+            params=battle_settings_query,
+            json=battle_settings_body,
+        )
 
-    thunderdome_response = requests.post(
-        request_url,
-        timeout=10,
-        headers=thunderdome_headers,
-        params=battle_settings_query,
-        json=battle_settings_body,
-    )
+    except requests.RequestException as err:
+        logging.error("Failed to create battle: %s", err)
+        return
 
     if not thunderdome_response.ok:
         logging.error("Failed to create battle")
-        logging.error(thunderdome_response.json())
+        logging.error(thunderdome_response.text)
+        return
 
     # TODO: Dirty fix because Thunderdome seems to ignore priorities on create
     # but not for updates
     battle_id = thunderdome_response.json()["data"]["id"]
-    update_game(battle_id, plans, args)
+    update_game(battle_id, plans, session)
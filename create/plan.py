@@ -3,64 +3,64 @@ Create Thunderdome game plans.
 """
 from __future__ import annotations
 
+import itertools
 import logging
-import re
 import typing
 
 from util.definitions import GITLAB_ISSUE_URL_REGEX
+from util.gitlab_graphql import fetch_issues_bulk
 from util.gitlab_issue import get_issues_from_epics, get_issues_from_iterations, \
-      get_issues_from_milestones, get_issues_from_projects, get_issue_info
+      get_issues_from_milestones, get_issues_from_projects
 
 
 if typing.TYPE_CHECKING:
     import argparse
 
+    import requests
 
-def create_plans(args: argparse.Namespace) -> list[dict]:
+
+def create_plans(args: argparse.Namespace, session: requests.Session) -> list[dict]:
     """
     Create plans for a battle in the Thunderdome API.
 
     :param args: Command line arguments.
+    :param session: Session for the GitLab API.
     """
-    issues: dict[int, str] = {}
+    issues: dict[int, dict] = {}
 
     if args.milestones:
-        issues.update(get_issues_from_milestones(args.milestones, args.token))
+        issues.update(get_issues_from_milestones(args.milestones, session, args.with_closed))
 
     if args.iterations:
-        issues.update(get_issues_from_iterations(args.iterations, args.token))
+        issues.update(get_issues_from_iterations(args.iterations, session, args.with_closed))
 
     if args.projects:
-        issues.update(get_issues_from_projects(args.projects, args.token))
+        issues.update(get_issues_from_projects(args.projects, session, args.with_closed))
 
     if args.epics:
-        issues.update(get_issues_from_epics(args.epics, args.token))
+        issues.update(get_issues_from_epics(args.epics, session, args.with_closed))
 
     if args.issues:
-        for issue in args.issues:
-            info = get_issue_info(issue, args.token)
-            issues.update({info["id"]: info["web_url"]})
+        # Don't fetch issues again that were already found in other items
+        known_links = {issue["web_url"] for issue in issues.values()}
+        links = [link for link in args.issues if link not in known_links]
+        for info in fetch_issues_bulk(links, session).values():
+            issues[info["id"]] = info
 
     logging.info("Found %d unique issues", len(issues))
 
     plans = create_plans_from_issues(
         issues,
-        args.token,
         args.label_priority,
         args.with_weighted,
         args.with_closed
     )
 
-    if args.label_priority:
-        # Sort plans by their priority
-        plans.sort(key=lambda x: x["priority"])
-
     return plans
 
 
 def create_plans_from_issues(
-    links: dict[int, str],
-    token: str,
+    issues: dict[int, dict],
     label_priority: dict[str, int] = None,
     with_weighted: bool = False,
     with_closed: bool = False
@@ -68,30 +68,32 @@ def create_plans_from_issues(
     """
     Create Thunderdome plans from GitLab issues.
 
-    :param links: GitLab issues to create plans from.
-    :param token: Token for the GitLab API.
+    :param issues: GitLab issues to create plans from.
     :param label_priority: Map of GitLab labels to Thunderdome priority value.
     :param with_weighted: Create plans for already weighted issues.
     :param with_closed: Create plans for already closed issues.
-    :return: Plans for the battle.
+    :return: Plans for the battle, ordered by their priority.
     """
-    logging.info("Fetching issues from GitLab...")
-
-    plans: list[dict] = []
-    for issue_link in links.values():
-        issue = get_issue_info(issue_link, token)
-
-        match = re.match(GITLAB_ISSUE_URL_REGEX, issue_link)
-
-        if not issue:
+    # Plans grouped by their priority, so they don't have to be sorted later
+    plan_buckets: dict[int, list[dict]] = {}
+    for issue in issues.values():
+        match = GITLAB_ISSUE_URL_REGEX.match(issue["web_url"])
+        if not match:
+            logging.error(
+                "Invalid URL '%s' does not match GitLab URL pattern '%s'",
+                issue["web_url"],
+                GITLAB_ISSUE_URL_REGEX.pattern,
+            )
             continue
 
+        project_path, issue_iid = match.group("project", "issue")
+
         if not with_weighted:
             if issue["weight"] is not None:
                 logging.info(
                     "Skipping %s#%s: Issue already has a weight set",
-                    match.group("project"),
-                    match.group("issue")
+                    project_path,
+                    issue_iid
                 )
                 continue
 
@@ -100,18 +102,19 @@ def create_plans_from_issues(
                 # Skip closed issues
                 logging.info(
                     "Skipping %s#%s: Issue is closed",
-                    match.group("project"),
-                    match.group("issue")
+                    project_path,
+                    issue_iid
                 )
                 continue
 
         # Priority of plan (99 is default for 'no priority')
         priority = 99
         if label_priority:
-            for label, prio in label_priority.items():
-                if label in issue['labels']:
-                    priority = prio
-                    break
+            # label_priority is ordered by priority, so the first hit is the highest
+            labels = set(issue['labels'])
+            priority = next(
+                (prio for label, prio in label_priority.items() if label in labels), 99
+            )
 
         plan = {
             # "description": issue["description"],
@@ -119,9 +122,11 @@ def create_plans_from_issues(
             "link": issue["web_url"],
             "name": issue["title"],
             "priority": priority,
-            "referenceId": f"{match.group('project')}#{issue['iid']}",
+            "referenceId": f"{project_path}#{issue_iid}",
             "type": "Task",
         }
-        plans.append(plan)
+        plan_buckets.setdefault(priority, []).append(plan)
 
-    return plans
+    return list(itertools.chain.from_iterable(
+        plan_buckets[priority] for priority in sorted(plan_buckets)
+    ))
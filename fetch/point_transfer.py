@@ -2,123 +2,209 @@
 Transfer points from Thunderdome games o GitLab issues.
 """
 
+from __future__ import annotations
+
+import itertools
 import logging
-import re
+import typing
+
+from concurrent.futures import ThreadPoolExecutor
 
 import requests
 
-from util.definitions import GITLAB_ISSUE_URL_REGEX
-from util.gitlab_id import get_project_id
+from util.definitions import GITLAB_ISSUE_URL_REGEX, GITLAB_PAGINATION_LIMIT, \
+    MAX_CONCURRENT_REQUESTS
+from util.gitlab_id import project_ref
+from util.paginate import paginate_request
+
+if typing.TYPE_CHECKING:
+    import re
 
 
 def transfer_points(
     plans: list[dict],
-    gitlab_token: str,
+    session: requests.Session,
     overwrite: bool = False
 ) -> None:
     """
     Transfer points to GitLab issues.
 
     :param plans: Plans from the Thunderdome game.
-    :param gitlab_token: Token for the GitLab API.
+    :param session: Session for the GitLab API.
     :param overwrite: True to overwrite existing weights, False to preserve existing weights.
     """
     logging.info("Transferring points to GitLab...")
 
-    gitlab_headers = {
-        "PRIVATE-TOKEN": gitlab_token,
-    }
-
+    # Group the plans by project, so that the current weights of their
+    # issues can be fetched with one request per project
+    project_plans: dict[str, dict[str, dict]] = {}
     for plan in plans:
-        points = plan["points"]
-        if not points:
-            logging.warning("Skipping plan %s: No points set for plan", plan["id"])
+        match = _match_plan(plan)
+        if not match:
             continue
 
-        try:
-            _ = int(points)
+        project_plans.setdefault(match.group("path"), {})[match.group("issue")] = plan
 
-        except ValueError:
-            logging.error(
-                "Skipping plan %s: Points is not an integer, found '%s' instead",
-                plan["id"],
-                points,
+    # Projects and plans are independent of each other, so they can be
+    # handled concurrently
+    with ThreadPoolExecutor(max_workers=MAX_CONCURRENT_REQUESTS) as executor:
+        if overwrite:
+            # Existing weights are replaced anyway, so they are not fetched
+            project_issues = itertools.repeat(None)
+
+        else:
+            project_issues = executor.map(
+                lambda item: _get_project_issues(item[0], list(item[1]), session),
+                project_plans.items(),
             )
-            continue
 
-        link = plan["link"]
-        if not link:
-            logging.warning("Skipping plan %s: No link set for plan", plan["id"])
-            continue
+        futures = []
+        for (project_path, iid_plans), issues in zip(project_plans.items(), project_issues):
+            for issue_iid, plan in iid_plans.items():
+                issue = None
+                if issues is not None:
+                    if issue_iid not in issues:
+                        logging.error("Failed to fetch issue %s#%s", project_path, issue_iid)
+                        continue
 
-        match = re.match(GITLAB_ISSUE_URL_REGEX, plan["link"])
-        if not match:
-            logging.error(
-                (
-                    "Skipping plan %s: Invalid URL '%s' does "
-                    "not match GitLab URL pattern '%s'"
-                ),
-                plan["id"],
-                plan["link"],
-                GITLAB_ISSUE_URL_REGEX.pattern,
-            )
-            continue
+                    issue = issues[issue_iid]
+
+                futures.append(executor.submit(
+                    _transfer_plan_points,
+                    plan,
+                    project_path,
+                    issue_iid,
+                    issue,
+                    session,
+                ))
 
-        project_path = match.group("project")
-        issue_iid = match.group("issue")
+    for future in futures:
+        future.result()
 
-        # Get project ID
-        project_id = get_project_id(link, gitlab_token, GITLAB_ISSUE_URL_REGEX)
 
-        # Get issue information
-        gitlab_response = requests.get(
-            f"https://gitlab.com/api/v4/projects/{project_id}/issues/{issue_iid}",
-            timeout=10,
-            headers=gitlab_headers,
+def _match_plan(plan: dict) -> re.Match | None:
+    """
+    Check that a plan has points that can be transferred to a GitLab issue.
+
+    :param plan: Plan from the Thunderdome game.
+    :return: Match of the plan's link or None if the plan is skipped.
+    """
+    plan_id, points, link = plan["id"], plan["points"], plan["link"]
+
+    if not points:
+        logging.warning("Skipping plan %s: No points set for plan", plan_id)
+        return None
+
+    # GitLab weights are non-negative integers
+    if not str(points).isdecimal():
+        logging.error(
+            "Skipping plan %s: Points is not an integer, found '%s' instead",
+            plan_id,
+            points,
         )
-        payload = gitlab_response.json()
+        return None
+
+    if not link:
+        logging.warning("Skipping plan %s: No link set for plan", plan_id)
+        return None
+
+    match = GITLAB_ISSUE_URL_REGEX.match(link)
+    if not match:
+        logging.error(
+            (
+                "Skipping plan %s: Invalid URL '%s' does "
+                "not match GitLab URL pattern '%s'"
+            ),
+            plan_id,
+            link,
+            GITLAB_ISSUE_URL_REGEX.pattern,
+        )
+        return None
 
-        if not gitlab_response.ok:
-            logging.error("Failed to fetch issue %s#%s", project_path, issue_iid)
-            continue
+    return match
+
+
+def _get_project_issues(
+    project_path: str,
+    iids: list[str],
+    session: requests.Session
+) -> dict[str, dict]:
+    """
+    Get issues of a single GitLab project.
+
+    :param project_path: Full path of the GitLab project.
+    :param iids: IIDs of the issues.
+    :param session: Session for the GitLab API.
+    :return: Issues by their IID.
+    """
+    project_id = project_ref(project_path)
+
+    issues: dict[str, dict] = {}
+    for idx in range(0, len(iids), GITLAB_PAGINATION_LIMIT):
+        # Issues that were fetched before an error can still be updated,
+        # the missing ones are reported by the caller
+        try:
+            for res in paginate_request(
+                f"https://gitlab.com/api/v4/projects/{project_id}/issues",
+                {"iids[]": iids[idx:idx + GITLAB_PAGINATION_LIMIT]},
+                session,
+            ):
+                payload = res.json()
+                for issue in payload:
+                    issues[str(issue["iid"])] = issue
+
+        except requests.HTTPError as err:
+            logging.error("Failed to fetch issues of project %s: %s", project_path, err)
+
+    return issues
+
+
+def _transfer_plan_points(
+    plan: dict,
+    project_path: str,
+    issue_iid: str,
+    issue: dict | None,
+    session: requests.Session
+) -> None:
+    """
+    Transfer the points of a single plan to its GitLab issue.
+
+    :param plan: Plan from the Thunderdome game.
+    :param project_path: Full path of the issue's GitLab project.
+    :param issue_iid: IID of the GitLab issue.
+    :param issue: Current state of the GitLab issue, or None to overwrite
+                  its weight without checking it.
+    :param session: Session for the GitLab API.
+    """
+    # Points were validated to be a non-negative integer
+    weight = int(plan["points"])
 
-        if not "weight" in payload:
+    if issue is not None:
+        if not "weight" in issue:
             logging.error(
                 "No 'weight' for issue in API response. Are you authenticated?"
             )
-            continue
+            return
 
-        previous_weight = payload["weight"]
-
-        if previous_weight is not None and overwrite is False:
+        if issue["weight"] is not None:
             logging.info(
                 "Skipping %s#%s: Issue already has a weight set",
                 project_path,
                 issue_iid,
             )
-            continue
+            return
 
-        # Set weight
-        gitlab_response = requests.put(
-            f"https://gitlab.com/api/v4/projects/{project_id}/issues/{issue_iid}",
-            timeout=10,
-            headers=gitlab_headers,
-            json={"weight": points},
-        )
+    # Set weight
+    gitlab_response = session.put(
+        f"https://gitlab.com/api/v4/projects/{project_ref(project_path)}/issues/{issue_iid}",
+        timeout=10,
+        json={"weight": weight},
+    )
 
-        if not gitlab_response.ok:
-            logging.error("Failed to set weight for %s#%s", project_path, issue_iid)
+    if not gitlab_response.ok:
+        logging.error("Failed to set weight for %s#%s", project_path, issue_iid)
 
-        else:
-            if previous_weight is not None:
-                logging.info(
-                    "Changed weight to %s for %s#%s (was %s)",
-                    points,
-                    project_path,
-                    issue_iid,
-                    previous_weight,
-                )
-            else:
-                logging.info(
-                    "Set weight to %s for %s#%s", points, project_path, issue_iid
-                )
+    else:
+        logging.info(
+            "Set weight to %s for %s#%s", weight, project_path, issue_iid
+        )
@@ -7,14 +7,11 @@ Main entrypoint for the application.
 import argparse
 import logging
 
-from itertools import batched
+from operator import itemgetter
 
-from create.game import create_game
-from create.plan import create_plans
-from fetch.point_transfer import transfer_points
-from update.game import update_game
-from update.plan import get_updated_plans
-from util.thunderdome_plan import get_plans
+
+# Priorities accepted by the Thunderdome API
+ALLOWED_PRIORITIES = frozenset((1, 2, 3, 4, 5, 6, 99))
 
 
 class MapPriorityAction(argparse.Action):
@@ -25,20 +22,24 @@ class MapPriorityAction(argparse.Action):
         super().__init__(option_strings, dest, nargs=nargs, **kwargs)
 
     def __call__(self, parser, namespace, values, option_string=None):
-        if not len(values) % 2 == 0:
+        if len(values) & 1:
             raise argparse.ArgumentTypeError("Priority assignment items list "
                                              "must have even length")
 
-        result = {}
-        for key, val in batched(values, n=2):
-            label = str(key)
-            priority = int(val)
-            if priority not in (1,2,3,4,5,6,99):
-                raise argparse.ArgumentTypeError("Thunderdome priority must be one of "
-                                                 "1,2,3,4,5,6,99")
-            result[label] = priority
+        # Iterate over (label, priority) pairs
+        items = iter(values)
+        pairs = [(str(key), int(val)) for key, val in zip(items, items)]
+
+        # Every pair is checked, including those of repeated labels
+        if any(priority not in ALLOWED_PRIORITIES for _, priority in pairs):
+            raise argparse.ArgumentTypeError("Thunderdome priority must be one of "
+                                             "1,2,3,4,5,6,99")
+
+        # Repeated labels keep the last priority given for them
+        priorities = dict(pairs)
 
-        result = dict(sorted(result.items(), key=lambda item: item[1]))
+        # Labels are inserted ordered by priority
+        result = dict(sorted(priorities.items(), key=itemgetter(1)))
 
         setattr(namespace, self.dest, result)
 
@@ -50,8 +51,40 @@ def parse_args() -> argparse.Namespace:
 
     parser = argparse.ArgumentParser(
         description='Thunderdome API automation script')
+    parser.add_argument("--no-cache", action="store_true",
+                        help="Don't revalidate API responses cached on disk")
+    parser.add_argument("--clear-cache", action="store_true",
+                        help="Remove API responses cached on disk before running")
+
     subparsers = parser.add_subparsers(dest='command', required=True)
 
+    # Arguments shared by the subcommands that read GitLab items
+    gitlab_parent = argparse.ArgumentParser(add_help=False)
+
+    gitlab_items = gitlab_parent.add_argument_group('GitLab items to include in the battle')
+    gitlab_items.add_argument("--milestones", nargs="+", default=[],
+                              help="Links to milestones to include in the battle")
+    gitlab_items.add_argument("--iterations", nargs="+", default=[],
+                              help="Links to iterations to include in the battle")
+    gitlab_items.add_argument("--projects", nargs="+", default=[],
+                              help="Links to projects to include in the battle")
+    gitlab_items.add_argument("--epics", nargs="+", default=[],
+                              help="Links to epics to include in the battle")
+    gitlab_items.add_argument("--issues", nargs="+", default=[],
+                              help="Links to issues to include in the battle")
+
+    gitlab_parent.add_argument("--with-weighted", action="store_true",
+                               help=("Include GitLab items in the battle "
+                               "that already have a weight set"))
+    gitlab_parent.add_argument("--with-closed", action="store_true",
+                               help=("Include GitLab items in the battle "
+                               "that are closed"))
+
+    gitlab_parent.add_argument("--label-priority", action=MapPriorityAction, nargs="*",
+                               help=("Map GitLab label names to Thunderdome priorities "
+                                     "(Example: 'high 1 medium 2')"
+                               ))
+
     fetch_parser = subparsers.add_parser(
         'fetch', help='Fetch battles from the Thunderdome API')
     fetch_parser.add_argument('battleid', help='Battle ID to fetch')
@@ -63,18 +96,18 @@ def parse_args() -> argparse.Namespace:
                               help="Overwrite existing weights")
 
     create_parser = subparsers.add_parser(
-        'create', help='Create Thunderdome battles from GitLab items')
+        'create', parents=[gitlab_parent],
+        help='Create Thunderdome battles from GitLab items')
     create_parser.add_argument('api_key', help='API key for the Thunderdome API')
     create_parser.add_argument('token', help='Token for the GitLab API')
 
     update_parser = subparsers.add_parser(
-        'update', help='Update Thunderdome battles from GitLab items')
+        'update', parents=[gitlab_parent],
+        help='Update Thunderdome battles from GitLab items')
     update_parser.add_argument('battleid', help='Battle ID to fetch')
     update_parser.add_argument('api_key', help='API key for the Thunderdome API')
     update_parser.add_argument('token', help='Token for the GitLab API')
 
-    # TODO: Use a shared parser for common arguments
-
     # Thunderdome battle creation arguments
     battle_settings = create_parser.add_argument_group('Battle creation arguments')
     battle_settings.add_argument('--auto-finish', action='store_true',
@@ -97,54 +130,6 @@ def parse_args() -> argparse.Namespace:
     battle_settings.add_argument('--allowed-values', nargs='+', type=str, default=[],
                                  help='Allowed values for points')
 
-    # GitLab items
-    gitlab_items = create_parser.add_argument_group('GitLab items to include in the battle')
-    gitlab_items.add_argument("--milestones", nargs="+", default=[],
-                              help="Links to milestones to include in the battle")
-    gitlab_items.add_argument("--iterations", nargs="+", default=[],
-                              help="Links to iterations to include in the battle")
-    gitlab_items.add_argument("--projects", nargs="+", default=[],
-                              help="Links to projects to include in the battle")
-    gitlab_items.add_argument("--epics", nargs="+", default=[],
-                              help="Links to epics to include in the battle")
-    gitlab_items.add_argument("--issues", nargs="+", default=[],
-                              help="Links to issues to include in the battle")
-
-    create_parser.add_argument("--with-weighted", action="store_true",
-                               help=("Include GitLab items in the battle "
-                               "that already have a weight set"))
-    create_parser.add_argument("--with-closed", action="store_true",
-                               help=("Include GitLab items in the battle "
-                               "that are closed"))
-
-    create_parser.add_argument("--label-priority", action=MapPriorityAction, nargs="*",
-                               help="Map GitLab labels to Thunderdome priorities")
-
-    # GitLab items
-    gitlab_items = update_parser.add_argument_group('GitLab items to include in the battle')
-    gitlab_items.add_argument("--milestones", nargs="+", default=[],
-                              help="Links to milestones to include in the battle")
-    gitlab_items.add_argument("--iterations", nargs="+", default=[],
-                              help="Links to iterations to include in the battle")
-    gitlab_items.add_argument("--projects", nargs="+", default=[],
-                              help="Links to projects to include in the battle")
-    gitlab_items.add_argument("--epics", nargs="+", default=[],
-                              help="Links to epics to include in the battle")
-    gitlab_items.add_argument("--issues", nargs="+", default=[],
-                              help="Links to issues to include in the battle")
-
-    update_parser.add_argument("--with-weighted",action="store_true",
-                               help=("Include GitLab items in the battle "
-                               "that already have a weight set"))
-    update_parser.add_argument("--with-closed", action="store_true",
-                               help=("Include GitLab items in the battle "
-                               "that are closed"))
-
-    update_parser.add_argument("--label-priority", action=MapPriorityAction, nargs="*",
-                               help=("Map GitLab label names to Thunderdome priorities"
-                                     "(Example: 'high 1 medium 2')"
-                               ))
-
     return parser.parse_args()
 
 
@@ -156,26 +141,55 @@ def main() -> None:
 
     logging.basicConfig(level=logging.INFO)
 
-    if args.command == "fetch":
-        plans = get_plans(args.battleid, args.api_key)
-        transfer_points(plans, args.token, args.overwrite)
+    # Subcommand modules are imported after parsing the arguments, so that
+    # '--help' and argument errors don't have to load the HTTP stack
+    from util.cache import clear_cache, prune_cache
+    from util.session import create_gitlab_session, create_thunderdome_session
+
+    if args.clear_cache:
+        clear_cache()
+
+    elif not args.no_cache:
+        prune_cache()
+
+    thunderdome_session = create_thunderdome_session(args.api_key, not args.no_cache)
+    gitlab_session = create_gitlab_session(args.token, not args.no_cache)
+
+    try:
+        if args.command == "fetch":
+            from fetch.point_transfer import transfer_points
+            from util.thunderdome_plan import get_plans
+
+            plans = get_plans(args.battleid, thunderdome_session)
+            transfer_points(plans, gitlab_session, args.overwrite)
+
+        elif args.command == "create":
+            from create.game import create_game
+            from create.plan import create_plans
+
+            plans = create_plans(args, gitlab_session)
+
+            if not plans:
+                logging.info("Skipping battle creation: No plans generated")
+                return
 
-    elif args.command == "create":
-        plans = create_plans(args)
+            create_game(plans, args, thunderdome_session)
 
-        if not plans:
-            logging.info("Skipping battle creation: No plans generated")
-            return
+        elif args.command == "update":
+            from update.game import update_game
+            from update.plan import get_updated_plans
+            from util.thunderdome_plan import get_plans
 
-        create_game(plans, args)
+            plans = get_plans(args.battleid, thunderdome_session)
 
-    elif args.command == "update":
-        plans = get_plans(args.battleid, args.api_key)
+            logging.info("Found %d unique Thunderdome plans", len(plans))
 
-        logging.info("Found %d unique Thunderdome plans", len(plans))
+            new_plans = get_updated_plans(plans, args, gitlab_session)
+            update_game(args.battleid, new_plans, thunderdome_session)
 
-        new_plans = get_updated_plans(plans, args)
-        update_game(args.battleid, new_plans, args)
+    finally:
+        thunderdome_session.close()
+        gitlab_session.close()
 
 
 if __name__ == "__main__":
@@ -0,0 +1,121 @@
+"""
+Tests for the on-disk response cache.
+"""
+
+import datetime
+import http.server
+import os
+import pathlib
+import tempfile
+import threading
+import time
+import unittest
+
+import requests
+
+from util.cache import CachingAdapter, prune_cache, store_json
+
+
+class _ETagHandler(http.server.BaseHTTPRequestHandler):
+    """
+    Serve a fixed body with an ETag and answer revalidations with 304.
+    """
+    protocol_version = "HTTP/1.1"
+
+    connections = 0
+
+    def setup(self):
+        super().setup()
+        type(self).connections += 1
+
+    def do_GET(self):  # pylint: disable=invalid-name
+        if self.headers.get("If-None-Match") == '"v1"':
+            self.send_response(304)
+            self.send_header("ETag", '"v1"')
+            self.end_headers()
+            return
+
+        body = b'{"id": 1}'
+        self.send_response(200)
+        self.send_header("ETag", '"v1"')
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, format, *args):  # pylint: disable=redefined-builtin
+        pass
+
+
+class CachingAdapterTest(unittest.TestCase):
+    """
+    Tests for CachingAdapter.
+    """
+
+    def setUp(self):
+        _ETagHandler.connections = 0
+        self.server = http.server.ThreadingHTTPServer(("127.0.0.1", 0), _ETagHandler)
+        threading.Thread(target=self.server.serve_forever, daemon=True).start()
+
+        self.cache_dir = tempfile.TemporaryDirectory()  # pylint: disable=consider-using-with
+        self.session = requests.Session()
+        self.session.mount("http://", CachingAdapter(
+            cache_dir=pathlib.Path(self.cache_dir.name), pool_maxsize=1
+        ))
+        self.url = f"http://127.0.0.1:{self.server.server_address[1]}/item"
+
+    def tearDown(self):
+        self.session.close()
+        self.server.shutdown()
+        self.server.server_close()
+        self.cache_dir.cleanup()
+
+    def test_revalidated_response_uses_cached_body(self):
+        self.session.get(self.url, timeout=10)
+        response = self.session.get(self.url, timeout=10)
+
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.json(), {"id": 1})
+
+    def test_revalidated_response_reuses_connection(self):
+        for _ in range(5):
+            self.session.get(self.url, timeout=10)
+
+        self.assertEqual(_ETagHandler.connections, 1)
+
+
+class CacheFilesTest(unittest.TestCase):
+    """
+    Tests for the files of the cache.
+    """
+
+    def setUp(self):
+        self.temp_dir = tempfile.TemporaryDirectory()  # pylint: disable=consider-using-with
+        self.cache_dir = pathlib.Path(self.temp_dir.name) / "cache" / "responses"
+
+    def tearDown(self):
+        self.temp_dir.cleanup()
+
+    def test_cache_dirs_are_private(self):
+        store_json(self.cache_dir / "entry.json", {})
+
+        self.assertEqual(self.cache_dir.stat().st_mode & 0o777, 0o700)
+        self.assertEqual(self.cache_dir.parent.stat().st_mode & 0o777, 0o700)
+
+    def test_prune_removes_unused_entries(self):
+        old_file = self.cache_dir / "old.json"
+        new_file = self.cache_dir / "new.json"
+        store_json(old_file, {})
+        store_json(new_file, {})
+
+        last_use = time.time() - datetime.timedelta(days=2).total_seconds()
+        os.utime(old_file, (last_use, last_use))
+
+        prune_cache(self.cache_dir, datetime.timedelta(days=1))
+
+        self.assertFalse(old_file.exists())
+        self.assertTrue(new_file.exists())
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -6,55 +6,58 @@ from __future__ import annotations
 import logging
 import typing
 
+from util.gitlab_graphql import fetch_issues_bulk
 from util.gitlab_issue import get_issues_from_epics, get_issues_from_iterations, \
-    get_issues_from_milestones, get_issues_from_projects, get_issue_info
+    get_issues_from_milestones, get_issues_from_projects
 from create.plan import create_plans_from_issues
 
 if typing.TYPE_CHECKING:
     import argparse
 
+    import requests
 
-def get_updated_plans(plans: list[dict], args: argparse.Namespace) -> list[dict]:
+
+def get_updated_plans(
+    plans: list[dict], args: argparse.Namespace, session: requests.Session
+) -> list[dict]:
     """
     Create plans for a battle in the Thunderdome API.
 
     :param args: Command line arguments.
+    :param session: Session for the GitLab API.
     """
-    issues: dict[int, str] = {}
+    issues: dict[int, dict] = {}
 
     if args.milestones:
-        issues.update(get_issues_from_milestones(args.milestones, args.token))
+        issues.update(get_issues_from_milestones(args.milestones, session, args.with_closed))
 
     if args.iterations:
-        issues.update(get_issues_from_iterations(args.iterations, args.token))
+        issues.update(get_issues_from_iterations(args.iterations, session, args.with_closed))
 
     if args.projects:
-        issues.update(get_issues_from_projects(args.projects, args.token))
+        issues.update(get_issues_from_projects(args.projects, session, args.with_closed))
 
     if args.epics:
-        issues.update(get_issues_from_epics(args.epics, args.token))
+        issues.update(get_issues_from_epics(args.epics, session, args.with_closed))
 
     if args.issues:
-        for issue in args.issues:
-            info = get_issue_info(issue, args.token)
-            issues.update({info["id"]: info["web_url"]})
+        # Don't fetch issues again that were already found in other items
+        known_links = {issue["web_url"] for issue in issues.values()}
+        links = [link for link in args.issues if link not in known_links]
+        for info in fetch_issues_bulk(links, session).values():
+            issues[info["id"]] = info
 
     logging.info("Found %d unique GitLab issues", len(issues))
 
     # Find GitLab URLs that are not in the Thunderdome game yet
-
-    # swap key and value so we can search by web_url
-    swapped_issues = dict((val, key) for key, val in issues.items())
-    for plan in plans:
-        if plan["link"] in swapped_issues:
-            swapped_issues.pop(plan["link"])
-
-    # Swap back to get issues by ID again
-    issues = dict((val, key) for key, val in swapped_issues.items())
+    existing_links = {plan["link"] for plan in plans}
+    issues = {
+        issue_id: issue for issue_id, issue in issues.items()
+        if issue["web_url"] not in existing_links
+    }
 
     new_plans = create_plans_from_issues(
         issues,
-        args.token,
         args.label_priority,
         args.with_weighted,
         args.with_closed
@@ -62,8 +65,4 @@ def get_updated_plans(plans: list[dict], args: argparse.Namespace) -> list[dict]
 
     logging.info("Found %d new plans", len(new_plans))
 
-    if args.label_priority:
-        # Sort plans by their priority
-        new_plans.sort(key=lambda x: x["priority"])
-
     return new_plans
@@ -0,0 +1,209 @@
+"""
+Cache API responses on disk and revalidate them with conditional requests.
+"""
+
+import contextlib
+import datetime
+import hashlib
+import json
+import logging
+import pathlib
+import shutil
+import time
+
+import requests
+
+from requests.adapters import HTTPAdapter
+
+
+CACHE_DIR = pathlib.Path("~/.thunderdome-cache").expanduser()
+RESPONSE_CACHE_DIR = CACHE_DIR / "responses"
+
+# Cached responses that were not used for this long are removed by prune_cache()
+CACHE_MAX_AGE = datetime.timedelta(days=30)
+
+# Response headers that are restored for revalidated responses
+CACHED_HEADERS = ("Content-Type", "Link")
+
+# Request headers that identify the user, so users don't share cache entries
+AUTH_HEADERS = ("PRIVATE-TOKEN", "X-API-Key")
+
+
+class CachingAdapter(HTTPAdapter):
+    """
+    HTTP adapter that stores GET responses with an ETag on disk.
+
+    Later requests for the same URL send the ETag in an 'If-None-Match' header.
+    If the server answers with '304 Not Modified', the cached body is returned
+    instead, so unchanged data is not transferred again.
+    """
+
+    def __init__(self, cache_dir: pathlib.Path = RESPONSE_CACHE_DIR, **kwargs):
+        super().__init__(**kwargs)
+
+        self.cache_dir = cache_dir
+
+    def send(self, request: requests.PreparedRequest, **kwargs) -> requests.Response:
+        if request.method != "GET":
+            return super().send(request, **kwargs)
+
+        cache_file = self.cache_dir / f"{_cache_key(request)}.json"
+        entry = _load_entry(cache_file)
+        if entry:
+            request.headers["If-None-Match"] = entry["etag"]
+
+        response = super().send(request, **kwargs)
+
+        if response.status_code == 304 and entry:
+            logging.debug("Using cached response for %s", request.url)
+
+            # The 304 has no body, but its connection has to be returned to
+            # the pool before the cached content replaces it
+            response.raw.drain_conn()
+            response.raw.release_conn()
+
+            response.status_code = 200
+            response.reason = "OK"
+            response.headers.update(entry["headers"])
+            response._content = entry["content"].encode()  # pylint: disable=protected-access
+            response._content_consumed = True  # pylint: disable=protected-access
+
+            # Mark the entry as used, so that prune_cache() keeps it
+            with contextlib.suppress(OSError):
+                cache_file.touch()
+
+        elif response.ok and "ETag" in response.headers:
+            _store_entry(cache_file, response)
+
+        return response
+
+
+def clear_cache(cache_dir: pathlib.Path = CACHE_DIR) -> None:
+    """
+    Remove all cached responses.
+
+    :param cache_dir: Directory of the cache.
+    """
+    logging.info("Clearing cache in %s...", cache_dir)
+    shutil.rmtree(cache_dir, ignore_errors=True)
+
+
+def prune_cache(
+    cache_dir: pathlib.Path = RESPONSE_CACHE_DIR,
+    max_age: datetime.timedelta = CACHE_MAX_AGE,
+) -> None:
+    """
+    Remove cached responses that were not used for a while.
+
+    :param cache_dir: Directory of the cached responses.
+    :param max_age: Time since the last use after which a response is removed.
+    """
+    oldest = time.time() - max_age.total_seconds()
+    for cache_file in cache_dir.glob("*.json"):
+        try:
+            if cache_file.stat().st_mtime < oldest:
+                cache_file.unlink()
+
+        except OSError as err:
+            logging.warning("Failed to remove cache file %s: %s", cache_file, err)
+
+
+def uses_cache(session: requests.Session) -> bool:
+    """
+    Check if a session uses the on-disk cache.
+
+    :param session: Session for an API.
+    """
+    return isinstance(session.get_adapter("https://"), CachingAdapter)
+
+
+def load_json(cache_file: pathlib.Path) -> dict:
+    """
+    Load a JSON object stored in the cache.
+
+    :param cache_file: File in the cache directory.
+    :return: Stored object or an empty dict if there is no usable file.
+    """
+    try:
+        with cache_file.open(encoding="utf-8") as file:
+            return json.load(file)
+
+    except (OSError, ValueError):
+        return {}
+
+
+def store_json(cache_file: pathlib.Path, data: dict) -> None:
+    """
+    Store a JSON object in the cache.
+
+    :param cache_file: File in the cache directory.
+    :param data: Object that is stored.
+    """
+    try:
+        _make_private_dir(cache_file.parent)
+        with cache_file.open("w", encoding="utf-8") as file:
+            json.dump(data, file)
+
+    except OSError as err:
+        logging.warning("Failed to write cache file %s: %s", cache_file, err)
+
+
+def _make_private_dir(directory: pathlib.Path) -> None:
+    """
+    Create a directory that only the user can access, including missing parents.
+
+    Cached responses contain private data, such as confidential issues.
+
+    :param directory: Directory that is created.
+    """
+    if not directory.parent.exists():
+        _make_private_dir(directory.parent)
+
+    directory.mkdir(mode=0o700, exist_ok=True)
+
+
+def _cache_key(request: requests.PreparedRequest) -> str:
+    """
+    Get the key of a request in the cache.
+
+    :param request: Request that is cached.
+    """
+    key = hashlib.sha256(request.url.encode())
+    for header in AUTH_HEADERS:
+        key.update(request.headers.get(header, "").encode())
+
+    return key.hexdigest()
+
+
+def _load_entry(cache_file: pathlib.Path) -> dict | None:
+    """
+    Load a cached response from disk.
+
+    :param cache_file: File of the cached response.
+    :return: Cached response or None if there is no usable entry.
+    """
+    return load_json(cache_file) or None
+
+
+def _store_entry(cache_file: pathlib.Path, response: requests.Response) -> None:
+    """
+    Store a response on disk.
+
+    :param cache_file: File of the cached response.
+    :param response: Response that is cached.
+    """
+    try:
+        content = response.content.decode()
+
+    except ValueError as err:
+        logging.warning("Failed to cache response for %s: %s", response.url, err)
+        return
+
+    store_json(cache_file, {
+        "etag": response.headers["ETag"],
+        "headers": {
+            header: response.headers[header]
+            for header in CACHED_HEADERS if header in response.headers
+        },
+        "content": content,
+    })
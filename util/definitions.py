@@ -5,30 +5,43 @@ Definitions of shared constants.
 import re
 
 
+# With re.ASCII, '[\w-]' matches the same characters as '[a-zA-Z0-9_-]'
 GITLAB_ORGA_MILESTONE_REGEX = re.compile(
-    r"https:\/\/gitlab\.com\/groups/(?P<orga>[a-zA-Z0-9\-\_]+)\/-\/"
-    r"milestones\/(?P<milestone>[0-9]+)"
+    r"https://gitlab\.com/groups/(?P<orga>[\w-]+)/-/"
+    r"milestones/(?P<milestone>[0-9]+)",
+    re.ASCII,
 )
 GITLAB_PROJECT_MILESTONE_REGEX = re.compile(
-    r"https:\/\/gitlab\.com\/(?P<orga>[a-zA-Z0-9\-\_]+)\/(?:(?P<subgroup>[a-zA-Z0-9\-\_]+)\/)*"
-    r"(?P<project>[a-zA-Z0-9\-\_]+)\/-\/milestones\/(?P<milestone>[0-9]+)"
+    r"https://gitlab\.com/(?P<orga>[\w-]+)/(?:(?P<subgroup>[\w-]+)/)*"
+    r"(?P<project>[\w-]+)/-/milestones/(?P<milestone>[0-9]+)",
+    re.ASCII,
 )
 GITLAB_ITERATION_REGEX = re.compile(
-    r"https:\/\/gitlab\.com\/groups/(?P<orga>[a-zA-Z0-9\-\_]+)\/-\/"
-    r"cadences\/(?P<cadence>[0-9]+)\/iterations\/(?P<iteration>[0-9]+)"
+    r"https://gitlab\.com/groups/(?P<orga>[\w-]+)/-/"
+    r"cadences/(?P<cadence>[0-9]+)/iterations/(?P<iteration>[0-9]+)",
+    re.ASCII,
 )
 GITLAB_EPIC_URL_REGEX = re.compile(
-    r"https:\/\/gitlab\.com\/groups\/(?P<orga>[a-zA-Z0-9\-\_]+)\/-\/"
-    r"epics\/(?P<epic>[0-9]+)"
+    r"https://gitlab\.com/groups/(?P<orga>[\w-]+)/-/"
+    r"epics/(?P<epic>[0-9]+)",
+    re.ASCII,
 )
 GITLAB_PROJECT_URL_REGEX = re.compile(
-    r"https:\/\/gitlab\.com\/(?P<orga>[a-zA-Z0-9\-\_]+)\/(?:(?P<subgroup>[a-zA-Z0-9\-\_]+)\/)*"
-    r"(?P<project>[a-zA-Z0-9\-\_]+)"
+    r"https://gitlab\.com/(?P<path>(?P<orga>[\w-]+)/(?:(?P<subgroup>[\w-]+)/)*"
+    r"(?P<project>[\w-]+))",
+    re.ASCII,
 )
 GITLAB_ISSUE_URL_REGEX = re.compile(
-    r"https:\/\/gitlab\.com\/(?P<orga>[a-zA-Z0-9\-\_]+)\/(?:(?P<subgroup>[a-zA-Z0-9\-\_]+)\/)*"
-    r"(?P<project>[a-zA-Z0-9\-\_]+)\/-\/issues\/(?P<issue>[0-9]+)"
+    r"https://gitlab\.com/(?P<path>(?P<orga>[\w-]+)/"
+    r"(?:(?P<subgroup>[\w-]+)/)*(?P<project>[\w-]+))"
+    r"/-/issues/(?P<issue>[0-9]+)",
+    re.ASCII,
 )
 
 # Maximum number of issues to fetch per request
 GITLAB_PAGINATION_LIMIT = 100
+
+GITLAB_GRAPHQL_URL = "https://gitlab.com/api/graphql"
+
+# Maximum number of requests sent to an API at the same time
+MAX_CONCURRENT_REQUESTS = 10
@@ -0,0 +1,142 @@
+"""
+Retrieve GitLab issue data in bulk using the GitLab GraphQL API.
+"""
+from __future__ import annotations
+
+import logging
+import typing
+
+from concurrent.futures import ThreadPoolExecutor
+
+from .definitions import GITLAB_GRAPHQL_URL, GITLAB_ISSUE_URL_REGEX, \
+    GITLAB_PAGINATION_LIMIT, MAX_CONCURRENT_REQUESTS
+
+if typing.TYPE_CHECKING:
+    import requests
+
+
+PROJECT_ISSUES_QUERY = """
+query($path: ID!, $iids: [String!]) {
+  project(fullPath: $path) {
+    issues(iids: $iids, first: %d) {
+      nodes {
+        id
+        iid
+        title
+        state
+        weight
+        webUrl
+        labels {
+          nodes {
+            title
+          }
+        }
+      }
+    }
+  }
+}
+""" % GITLAB_PAGINATION_LIMIT
+
+
+def fetch_issues_bulk(links: list[str], session: requests.Session) -> dict[str, dict]:
+    """
+    Get information about many GitLab issues with one request per project.
+
+    The returned issues have the same keys as the issues returned by the
+    GitLab REST API, so they can be used like the results of the REST list
+    endpoints.
+
+    :param links: Links to the GitLab issues.
+    :param session: Session for the GitLab API.
+    :return: Issues by their link. Links that could not be fetched are omitted.
+    """
+    # Group the issue IIDs by project
+    project_issues: dict[str, dict[str, str]] = {}
+    for link in links:
+        match = GITLAB_ISSUE_URL_REGEX.match(link)
+        if not match:
+            logging.error(
+                "Invalid URL '%s' does not match GitLab URL pattern '%s'",
+                link,
+                GITLAB_ISSUE_URL_REGEX.pattern,
+            )
+            continue
+
+        project_issues.setdefault(match.group("path"), {})[match.group("issue")] = link
+
+    # Each query may return at most one page of issues
+    batches: list[tuple[str, dict[str, str]]] = []
+    for project_path, iid_links in project_issues.items():
+        iids = list(iid_links)
+        for idx in range(0, len(iids), GITLAB_PAGINATION_LIMIT):
+            batch = iids[idx:idx + GITLAB_PAGINATION_LIMIT]
+            batches.append((project_path, {iid: iid_links[iid] for iid in batch}))
+
+    with ThreadPoolExecutor(max_workers=MAX_CONCURRENT_REQUESTS) as executor:
+        results = executor.map(
+            lambda batch: _fetch_project_issues(*batch, session), batches
+        )
+
+    issues: dict[str, dict] = {}
+    for result in results:
+        issues.update(result)
+
+    return issues
+
+
+def _fetch_project_issues(
+    project_path: str, iid_links: dict[str, str], session: requests.Session
+) -> dict[str, dict]:
+    """
+    Get information about GitLab issues of a single project.
+
+    :param project_path: Full path of the GitLab project.
+    :param iid_links: Links to the GitLab issues by their IID.
+    :param session: Session for the GitLab API.
+    :return: Issues by their link.
+    """
+    gitlab_response = session.post(
+        GITLAB_GRAPHQL_URL,
+        timeout=10,
+        json={
+            "query": PROJECT_ISSUES_QUERY,
+            "variables": {"path": project_path, "iids": list(iid_links)},
+        },
+    )
+
+    if not gitlab_response.ok:
+        logging.error("Failed to fetch issues of project %s", project_path)
+        return {}
+
+    payload = gitlab_response.json()
+    if payload.get("errors"):
+        logging.error(
+            "Failed to fetch issues of project %s: %s",
+            project_path,
+            payload["errors"],
+        )
+        return {}
+
+    project = payload["data"]["project"]
+    if not project:
+        logging.error("Failed to find project %s", project_path)
+        return {}
+
+    issues: dict[str, dict] = {}
+    for node in project["issues"]["nodes"]:
+        issues[iid_links[node["iid"]]] = {
+            # Global IDs have the form 'gid://gitlab/Issue/<id>'
+            "id": int(node["id"].rsplit("/", 1)[-1]),
+            "iid": int(node["iid"]),
+            "labels": [label["title"] for label in node["labels"]["nodes"]],
+            "state": node["state"],
+            "title": node["title"],
+            "web_url": node["webUrl"],
+            "weight": node["weight"],
+        }
+
+    for iid, link in iid_links.items():
+        if link not in issues:
+            logging.error("Failed to fetch issue %s#%s", project_path, iid)
+
+    return issues
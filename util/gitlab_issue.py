@@ -2,35 +2,39 @@
 Retrieve GitLab issue data using the GitLab API.
 """
 
-import re
+from __future__ import annotations
+
 import logging
 
+from concurrent.futures import ThreadPoolExecutor
+
 import requests
 
 from .definitions import GITLAB_EPIC_URL_REGEX, GITLAB_ORGA_MILESTONE_REGEX, \
-    GITLAB_PAGINATION_LIMIT, GITLAB_ITERATION_REGEX, GITLAB_PROJECT_URL_REGEX, \
-    GITLAB_ISSUE_URL_REGEX
-from .gitlab_id import get_group_id, get_project_id
+    GITLAB_ITERATION_REGEX, GITLAB_PROJECT_URL_REGEX, MAX_CONCURRENT_REQUESTS
+from .gitlab_id import group_ref, project_ref
 from .paginate import paginate_request
 
 
-def get_issues_from_milestones(links: list[str], token: str) -> dict[int, str]:
+def get_issues_from_milestones(
+    links: list[str], session: requests.Session, with_closed: bool = True
+) -> dict[int, dict]:
     """
     Get issues from GitLab milestones.
 
     :param links: GitLab milestone URLs to create plans from.
-    :param token: Token for the GitLab API.
+    :param session: Session for the GitLab API.
+    :param with_closed: Include closed issues.
+    :return: Issues by their ID.
     """
     logging.info("Fetching milestones from GitLab...")
 
-    gitlab_headers = {
-        "PRIVATE-TOKEN": token,
-    }
-
-    issues: dict[int, str] = {}
+    # Group the milestone IIDs by group, so that the milestones of each
+    # group are looked up together
+    group_milestones: dict[str, list[str]] = {}
     for link in links:
         # check if the link is a group milestone
-        match = re.match(GITLAB_ORGA_MILESTONE_REGEX, link)
+        match = GITLAB_ORGA_MILESTONE_REGEX.match(link)
         if not match:
             logging.error(
                 "Invalid URL '%s' does not match GitLab URL pattern '%s'",
@@ -39,59 +43,58 @@ def get_issues_from_milestones(links: list[str], token: str) -> dict[int, str]:
             )
             continue
 
-        group_name = match.group("orga")
-
-        # get group ID
-        group_id = get_group_id(group_name, token)
-
-        # get milestone ID
-        milestone_iid = match.group("milestone")
-        gitlab_response = requests.get(
-            f"https://gitlab.com/api/v4/groups/{group_id}/milestones",
-            timeout=10,
-            params={"iids": [milestone_iid]},
-            headers=gitlab_headers,
-        )
-
-        if not gitlab_response.ok:
-            logging.error("Failed to fetch milestone %s", milestone_iid)
-            continue
-
-        payload = gitlab_response.json()
-        milestone_name = payload[0]["title"]
-
-        for res in paginate_request(
-            "https://gitlab.com/api/v4/issues",
-            {
-                "milestone": milestone_name, 
-                "per_page": GITLAB_PAGINATION_LIMIT, 
+        group_milestones.setdefault(match.group("orga"), []).append(match.group("milestone"))
+
+    issue_lists: list[tuple[str, dict]] = []
+    for group_name, milestone_iids in group_milestones.items():
+        # get milestone titles
+        milestone_titles: dict[str, str] = {}
+        try:
+            for res in paginate_request(
+                f"https://gitlab.com/api/v4/groups/{group_ref(group_name)}/milestones",
+                {"iids[]": milestone_iids},
+                session,
+            ):
+                payload = res.json()
+                for milestone in payload:
+                    milestone_titles[str(milestone["iid"])] = milestone["title"]
+
+        except requests.HTTPError as err:
+            logging.error("Failed to fetch milestones of group %s: %s", group_name, err)
+
+        for milestone_iid in milestone_iids:
+            if milestone_iid not in milestone_titles:
+                logging.error("Failed to fetch milestone %s", milestone_iid)
+
+        for milestone_name in milestone_titles.values():
+            params = {
+                "milestone": milestone_name,
                 "scope": "all",
-            },
-            gitlab_headers,
-        ):
-            payload = res.json()
-            for issue in payload:
-                issues.update({issue["id"]: issue["web_url"]})
+            }
+            if not with_closed:
+                params["state"] = "opened"
 
-    return issues
+            issue_lists.append(("https://gitlab.com/api/v4/issues", params))
+
+    return _get_issue_lists(issue_lists, session, with_closed)
 
 
-def get_issues_from_iterations(links: list[str], token: str) -> dict[int, str]:
+def get_issues_from_iterations(
+    links: list[str], session: requests.Session, with_closed: bool = True
+) -> dict[int, dict]:
     """
     Create Thunderdome plans from GitLab iterations.
 
     :param links: GitLab iteration URLs to create plans from.
-    :param token: Token for the GitLab API.
+    :param session: Session for the GitLab API.
+    :param with_closed: Include closed issues.
+    :return: Issues by their ID.
     """
     logging.info("Fetching iterations from GitLab...")
 
-    gitlab_headers = {
-        "PRIVATE-TOKEN": token,
-    }
-
-    issues: dict[int, str] = {}
+    issue_lists: list[tuple[str, dict]] = []
     for link in links:
-        match = re.match(GITLAB_ITERATION_REGEX, link)
+        match = GITLAB_ITERATION_REGEX.match(link)
         if not match:
             logging.error(
                 "Invalid URL '%s' does not match GitLab URL pattern '%s'",
@@ -102,38 +105,34 @@ def get_issues_from_iterations(links: list[str], token: str) -> dict[int, str]:
 
         iteration_id = match.group("iteration")
 
-        for res in paginate_request(
-            "https://gitlab.com/api/v4/issues",
-            {
-                "iteration_id": iteration_id, 
-                "per_page": GITLAB_PAGINATION_LIMIT,
-                "scope": "all",
-            },
-            gitlab_headers,
-        ):
-            payload = res.json()
-            for issue in payload:
-                issues.update({issue["id"]: issue["web_url"]})
+        params = {
+            "iteration_id": iteration_id,
+            "scope": "all",
+        }
+        if not with_closed:
+            params["state"] = "opened"
 
-    return issues
+        issue_lists.append(("https://gitlab.com/api/v4/issues", params))
+
+    return _get_issue_lists(issue_lists, session, with_closed)
 
 
-def get_issues_from_projects(links: list[str], token: str) -> dict[int, str]:
+def get_issues_from_projects(
+    links: list[str], session: requests.Session, with_closed: bool = True
+) -> dict[int, dict]:
     """
     Create Thunderdome plans from GitLab projects.
 
     :param links: GitLab project URLs to create plans from.
-    :param token: Token for the GitLab API.
+    :param session: Session for the GitLab API.
+    :param with_closed: Include closed issues.
+    :return: Issues by their ID.
     """
     logging.info("Fetching projects from GitLab...")
 
-    gitlab_headers = {
-        "PRIVATE-TOKEN": token,
-    }
-
-    issues: dict[int, str] = {}
+    issue_lists: list[tuple[str, dict]] = []
     for link in links:
-        match = re.match(GITLAB_PROJECT_URL_REGEX, link)
+        match = GITLAB_PROJECT_URL_REGEX.match(link)
         if not match:
             logging.error(
                 "Invalid URL '%s' does not match GitLab URL pattern '%s'",
@@ -142,40 +141,35 @@ def get_issues_from_projects(links: list[str], token: str) -> dict[int, str]:
             )
             continue
 
-        # get project ID
-        project_id = get_project_id(link, token, GITLAB_PROJECT_URL_REGEX)
+        project_id = project_ref(match.group("path"))
 
-        for res in paginate_request(
-            f"https://gitlab.com/api/v4/projects/{project_id}/issues",
-            {
-                "per_page": GITLAB_PAGINATION_LIMIT, 
-                "scope": "all",
-            },
-            gitlab_headers,
-        ):
-            payload = res.json()
-            for issue in payload:
-                issues.update({issue["id"]: issue["web_url"]})
+        params = {
+            "scope": "all",
+        }
+        if not with_closed:
+            params["state"] = "opened"
 
-    return issues
+        issue_lists.append((f"https://gitlab.com/api/v4/projects/{project_id}/issues", params))
+
+    return _get_issue_lists(issue_lists, session, with_closed)
 
 
-def get_issues_from_epics(links: list[str], token: str) -> dict[int, str]:
+def get_issues_from_epics(
+    links: list[str], session: requests.Session, with_closed: bool = True
+) -> dict[int, dict]:
     """
     Create Thunderdome plans from GitLab epics.
 
     :param links: GitLab epics to create plans from.
-    :param token: Token for the GitLab API.
+    :param session: Session for the GitLab API.
+    :param with_closed: Include closed issues.
+    :return: Issues by their ID.
     """
     logging.info("Fetching epics from GitLab...")
 
-    gitlab_headers = {
-        "PRIVATE-TOKEN": token,
-    }
-
-    issues: dict[int, str] = {}
+    issue_lists: list[tuple[str, dict]] = []
     for link in links:
-        match = re.match(GITLAB_EPIC_URL_REGEX, link)
+        match = GITLAB_EPIC_URL_REGEX.match(link)
         if not match:
             logging.error(
                 "Invalid URL '%s' does not match GitLab URL pattern '%s'",
@@ -187,59 +181,67 @@ def get_issues_from_epics(links: list[str], token: str) -> dict[int, str]:
         group_name = match.group("orga")
         epic_iid = match.group("epic")
 
-        # get group ID
-        group_id = get_group_id(group_name, token)
-
-        for res in paginate_request(
-            f"https://gitlab.com/api/v4/groups/{group_id}/epics/{epic_iid}/issues",
+        # The epic issues endpoint can't filter by state, so closed
+        # issues are filtered by _get_issue_lists()
+        issue_lists.append((
+            f"https://gitlab.com/api/v4/groups/{group_ref(group_name)}/epics/{epic_iid}/issues",
             {
-                "per_page": GITLAB_PAGINATION_LIMIT, 
                 "scope": "all",
             },
-            gitlab_headers,
-        ):
-            payload = res.json()
-            for issue in payload:
-                issues.update({issue["id"]: issue["web_url"]})
+        ))
 
-    return issues
+    return _get_issue_lists(issue_lists, session, with_closed)
 
 
-def get_issue_info(issue_link: str, token: str) -> dict | None:
+def _get_issue_lists(
+    issue_lists: list[tuple[str, dict]],
+    session: requests.Session,
+    with_closed: bool = True
+) -> dict[int, dict]:
     """
-    Get information about a GitLab issue from the GitLab API.
+    Get the issues of several GitLab issue lists.
+
+    The lists are independent of each other, so they are fetched concurrently.
 
-    :param link: Link to the GitLab issue.
-    :param token: Token for the GitLab API.
+    :param issue_lists: URL and request parameters of each issue list.
+    :param session: Session for the GitLab API.
+    :param with_closed: Include closed issues.
+    :return: Issues by their ID.
     """
-    gitlab_headers = {
-        "PRIVATE-TOKEN": token,
-    }
-
-    match = re.match(GITLAB_ISSUE_URL_REGEX, issue_link)
-    if not match:
-        logging.error(
-            "Invalid URL '%s' does not match GitLab URL pattern '%s'",
-            issue_link,
-            GITLAB_ISSUE_URL_REGEX.pattern,
+    with ThreadPoolExecutor(max_workers=MAX_CONCURRENT_REQUESTS) as executor:
+        results = executor.map(
+            lambda issue_list: _get_issue_list(*issue_list, session), issue_lists
         )
-        return None
 
-    project_path = match.group("project")
-    issue_iid = match.group("issue")
+    issues: dict[int, dict] = {}
+    for result in results:
+        for issue in result:
+            # Not every endpoint can filter by state
+            if not with_closed and issue["state"] != "opened":
+                continue
 
-    # Get project ID
-    project_id = get_project_id(issue_link, token, GITLAB_ISSUE_URL_REGEX)
+            issues[issue["id"]] = issue
 
-    # Get issue information
-    gitlab_response = requests.get(
-        f"https://gitlab.com/api/v4/projects/{project_id}/issues/{issue_iid}",
-        timeout=10,
-        headers=gitlab_headers,
-    )
+    return issues
 
-    if not gitlab_response.ok:
-        logging.error("Failed to fetch issue %s#%s", project_path, issue_iid)
-        return None
 
-    return gitlab_response.json()
+def _get_issue_list(url: str, params: dict, session: requests.Session) -> list[dict]:
+    """
+    Get all issues of a single GitLab issue list.
+
+    :param url: URL of the issue list in the GitLab API.
+    :param params: Parameters for the request.
+    :param session: Session for the GitLab API.
+    :return: Issues of the list.
+    """
+    issues: list[dict] = []
+    try:
+        for res in paginate_request(url, params, session):
+            issues.extend(res.json())
+
+    except requests.HTTPError as err:
+        # Don't use an incomplete list
+        logging.error("Failed to fetch issues: %s", err)
+        return []
+
+    return issues
@@ -2,37 +2,46 @@
 """
 Make paginated requests.
 """
+from __future__ import annotations
 
-import logging
 import typing
 
-import requests
+from concurrent.futures import ThreadPoolExecutor
+
+from .definitions import GITLAB_PAGINATION_LIMIT
+
+if typing.TYPE_CHECKING:
+    import requests
 
 
 def paginate_request(
-    url: str, params: dict, headers: dict
+    url: str, params: dict, session: requests.Session
 ) -> typing.Generator[requests.Response, None, None]:
     """
     Paginate through a GitLab API request.
 
+    Pages are requested with the maximum page size and followed through
+    the 'next' link of the response. The next page is already requested
+    while the caller processes the current one.
+
     :param url: URL to the GitLab API.
     :param params: Parameters for the request.
-    :param headers: Headers for the request.
+    :param session: Session for the GitLab API.
     :return: Response from the request.
+    :raises requests.HTTPError: If a page could not be fetched, so callers
+                                don't mistake a partial result for a complete one.
     """
-    response = requests.get(url, timeout=10, params=params, headers=headers)
-    if not response.ok:
-        logging.error("Failed to fetch %s", url)
-        return None
-
-    yield response
-
-    while "next" in response.links:
-        response = requests.get(
-            response.links["next"]["url"], timeout=10, headers=headers
-        )
-        if not response.ok:
-            logging.error("Failed to fetch %s", url)
-            return None
-
-        yield response
+    params = {"per_page": GITLAB_PAGINATION_LIMIT, **params}
+
+    with ThreadPoolExecutor(max_workers=1) as executor:
+        next_page = executor.submit(session.get, url, timeout=10, params=params)
+        while next_page is not None:
+            response = next_page.result()
+            response.raise_for_status()
+
+            next_page = None
+            next_link = response.links.get("next")
+            if next_link:
+                next_page = executor.submit(session.get, next_link["url"], timeout=10)
+
+            yield response
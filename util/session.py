@@ -0,0 +1,118 @@
+"""
+Shared HTTP sessions for the Thunderdome and GitLab APIs.
+"""
+
+import requests
+
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
+
+from .cache import CachingAdapter
+from .definitions import GITLAB_GRAPHQL_URL
+
+
+# Retry rate limited requests and temporary server errors with exponential backoff.
+# POST is not retried, because a failed response or a read timeout can
+# arrive after Thunderdome already created the battle or plan. Only
+# THUNDERDOME_RETRY_POLICY retries POST, and only when it was rate limited.
+RETRY_POLICY = Retry(
+    total=5,
+    backoff_factor=0.5,
+    status_forcelist=(429, 502, 503, 504),
+    allowed_methods=frozenset(("GET", "PUT")),
+    respect_retry_after_header=True,
+    # Return the last response so callers can handle it like any failed request
+    raise_on_status=False,
+)
+
+# GraphQL queries are sent as POST but only read data, so they are safe to retry
+GRAPHQL_RETRY_POLICY = RETRY_POLICY.new(allowed_methods=frozenset(("POST",)))
+
+
+class RateLimitRetry(Retry):
+    """
+    Retry policy that also retries rate limited POST requests.
+
+    Thunderdome rejects rate limited requests with '429 Too Many Requests'
+    before processing them, so retrying them can't create a battle or plan
+    twice. Other failed POST requests are not retried.
+    """
+
+    def is_retry(self, method: str, status_code: int, has_retry_after: bool = False) -> bool:
+        if method == "POST" and not self._is_method_retryable(method):
+            return status_code == 429
+
+        return super().is_retry(method, status_code, has_retry_after)
+
+
+THUNDERDOME_RETRY_POLICY = RateLimitRetry(
+    total=RETRY_POLICY.total,
+    backoff_factor=RETRY_POLICY.backoff_factor,
+    status_forcelist=RETRY_POLICY.status_forcelist,
+    allowed_methods=RETRY_POLICY.allowed_methods,
+    respect_retry_after_header=True,
+    raise_on_status=False,
+)
+
+
+def create_session(
+    headers: dict, use_cache: bool = True, retries: Retry = RETRY_POLICY
+) -> requests.Session:
+    """
+    Create a HTTP session that keeps connections alive between requests.
+
+    GET and PUT requests that fail because of rate limiting or temporary
+    server errors are retried automatically.
+
+    :param headers: Headers sent with every request of the session.
+    :param use_cache: True to revalidate responses cached on disk, False to always
+                      fetch the full response.
+    :param retries: Policy for retrying failed requests.
+    :return: Session with a pool of reusable connections.
+    """
+    session = requests.Session()
+    session.headers.update(headers)
+
+    adapter_type = CachingAdapter if use_cache else HTTPAdapter
+    session.mount("https://", adapter_type(
+        pool_connections=10, pool_maxsize=20, max_retries=retries
+    ))
+
+    return session
+
+
+def create_thunderdome_session(api_key: str, use_cache: bool = True) -> requests.Session:
+    """
+    Create a HTTP session for the Thunderdome API.
+
+    Rate limited POST requests are retried as well, because Thunderdome
+    did not process them.
+
+    :param api_key: API key for the Thunderdome API.
+    :param use_cache: True to use the on-disk response cache.
+    :return: Session authenticated for the Thunderdome API.
+    """
+    return create_session({
+        "accept": "application/json",
+        "X-API-Key": api_key,
+    }, use_cache, THUNDERDOME_RETRY_POLICY)
+
+
+def create_gitlab_session(token: str, use_cache: bool = True) -> requests.Session:
+    """
+    Create a HTTP session for the GitLab API.
+
+    :param token: Token for the GitLab API.
+    :param use_cache: True to use the on-disk response cache.
+    :return: Session authenticated for the GitLab API.
+    """
+    session = create_session({
+        "PRIVATE-TOKEN": token,
+    }, use_cache)
+
+    # POST responses are never cached, so the GraphQL endpoint only needs retries
+    session.mount(GITLAB_GRAPHQL_URL, HTTPAdapter(
+        pool_connections=1, pool_maxsize=20, max_retries=GRAPHQL_RETRY_POLICY
+    ))
+
+    return session
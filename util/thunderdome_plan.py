@@ -1,32 +1,29 @@
 """
 Retrieve game plans from the Thunderdome API.
 """
+from __future__ import annotations
 
 import logging
+import typing
 
-import requests
+if typing.TYPE_CHECKING:
+    import requests
 
 
-def get_plans(battle_id: str, api_key: str) -> list[dict]:
+def get_plans(battle_id: str, session: requests.Session) -> list[dict]:
     """
     Get plans from the Thunderdome API.
 
     :param battle_id: Battle ID to fetch.
-    :param api_key: API key for the Thunderdome API.
+    :param session: Session for the Thunderdome API.
     :return: Plans for the battle.
     """
     logging.info("Fetching plans for battle %s...", battle_id)
 
-    thunderdome_headers = {
-        "accept": "application/json",
-        "X-API-Key": api_key,
-    }
-
     # Thunderdome request
-    thunderdome_response = requests.get(
+    thunderdome_response = session.get(
         f"https://thunderdome.dev/api/battles/{battle_id}",
         timeout=10,
-        headers=thunderdome_headers,
     )
 
     if not thunderdome_response.ok:
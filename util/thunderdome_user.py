@@ -0,0 +1,58 @@
+"""
+Retrieve user data from the Thunderdome API.
+"""
+from __future__ import annotations
+
+import hashlib
+import logging
+import typing
+
+from .cache import CACHE_DIR, load_json, store_json, uses_cache
+
+if typing.TYPE_CHECKING:
+    import pathlib
+
+    import requests
+
+
+USER_CACHE_FILE = CACHE_DIR / "users.json"
+
+
+def get_user_id(
+    session: requests.Session, cache_file: pathlib.Path = USER_CACHE_FILE
+) -> str | None:
+    """
+    Get the ID of the user that owns the API key of the session.
+
+    The ID never changes for an API key, so it is stored on disk and
+    only requested from the API on the first run, if the session uses
+    the cache.
+
+    :param session: Session for the Thunderdome API.
+    :param cache_file: File that stores user IDs by API key hash.
+    :return: ID of the user or None if the user could not be fetched.
+    """
+    use_cache = uses_cache(session)
+    key = hashlib.sha256(session.headers.get("X-API-Key", "").encode()).hexdigest()
+
+    user_ids: dict[str, str] = {}
+    if use_cache:
+        user_ids = load_json(cache_file)
+        if key in user_ids:
+            return user_ids[key]
+
+    thunderdome_response = session.get("https://thunderdome.dev/api/auth/user", timeout=10)
+
+    if not thunderdome_response.ok:
+        logging.error("Failed to fetch Thunderdome user")
+        logging.error(thunderdome_response.text)
+        return None
+
+    payload = thunderdome_response.json()
+    user_id = payload["data"]["id"]
+
+    if use_cache:
+        user_ids[key] = user_id
+        store_json(cache_file, user_ids)
+
+    return user_id